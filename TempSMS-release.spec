@@ -0,0 +1,79 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Production build of the Tk GUI: pyinstaller TempSMS-release.spec
+#
+# Unlike TempSMS.spec (one-file debug build) this produces dist/TempSMS/, a
+# one-dir bundle that starts without unpacking itself to a temp dir, with
+# the non-debug windowed bootloader, no UPX (decompressing every DLL on each
+# launch costs more than it saves) and the CLI/Qt-only modules left out.
+import os
+
+block_cipher = None
+current_dir = os.path.abspath(os.path.dirname('__file__'))
+
+a = Analysis(
+    [os.path.join(current_dir, 'temp_sms_gui_tk.py')],
+    pathex=[current_dir],
+    binaries=[],
+    datas=[],
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=[
+        # CLI only (tempsms.py skips them when frozen), pyfiglet drags in its fonts
+        'colorama',
+        'pyfiglet',
+        # Qt GUI only
+        'temp_sms_gui',
+        'PyQt5',
+        'PyQt6',
+        'PySide2',
+        'PySide6',
+        'qt_material',
+        # Dev and test tooling
+        'unittest',
+        'doctest',
+        'pydoc',
+        'pydoc_data',
+        'lib2to3',
+        'setuptools',
+        'pip',
+        'test',
+        'tkinter.test',
+    ],
+    win_no_prefer_redirects=False,
+    win_private_assemblies=False,
+    cipher=block_cipher,
+    noarchive=False,
+)
+
+pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='TempSMS',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=False,
+    disable_windowed_traceback=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon=None
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='TempSMS',
+)
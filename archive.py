@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+# coding: utf-8
+# Full-text searchable archive of every message fetched through fetch_sms.
+
+import argparse
+import atexit
+import hashlib
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+from timeparse import absolute_time, parse_time, relative_age
+
+
+
+def data_dir() -> str:
+    """Per-user directory for TempSMS data, independent of the CWD."""
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+        return os.path.join(base, "TempSMS")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Application Support/TempSMS")
+    base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(base, "tempsms")
+
+
+ARCHIVE_FILE = os.environ.get("TEMPSMS_ARCHIVE") or os.path.join(data_dir(), "messages.db")
+BATCH_SIZE = 500
+BATCH_WAIT = 0.5
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    key TEXT UNIQUE NOT NULL,
+    number TEXT NOT NULL,
+    from_number TEXT,
+    message_time TEXT,
+    message_epoch REAL,
+    body TEXT,
+    fetched REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_number ON messages (number, message_epoch);
+CREATE INDEX IF NOT EXISTS messages_from ON messages (from_number, message_epoch);
+CREATE INDEX IF NOT EXISTS messages_epoch ON messages (message_epoch);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5 (
+    body, from_number, number, content='messages', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, body, from_number, number)
+    VALUES (new.id, new.body, new.from_number, new.number);
+END;
+"""
+
+
+def message_key(number: str, message: dict) -> str:
+    """Identity of a message across fetches: number, sender, body and time.
+
+    The time only counts when it is absolute; a relative one ("5 minutes
+    ago") changes between fetches of the same message.
+    """
+    when = message.get("message_time")
+    epoch = absolute_time(when)
+    if epoch is not None:
+        when = epoch
+    elif relative_age(when) is not None:
+        when = None
+    digest = hashlib.sha1()
+    for field in (number, message.get("FromNumber"), when, message.get("Messagebody")):
+        digest.update(str(field).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def text(value) -> str:
+    """SQLite-bindable form of an API field, whatever type it arrived as."""
+    return None if value is None else str(value)
+
+
+def log_error(message: str) -> None:
+    if sys.stderr is not None:
+        print(f"[!] {message}", file=sys.stderr)
+
+
+def match_expression(text: str) -> str:
+    """Quote every word so user input can never be an FTS5 syntax error."""
+    return " ".join('"{}"'.format(word.replace('"', '""')) for word in text.split())
+
+
+class MessageArchive:
+    """SQLite FTS5 store of fetched messages.
+
+    ``add`` only enqueues; a background thread opens the database and writes
+    the queue in batches, one transaction per batch, so archiving costs the
+    fetch path nothing. Duplicates (same number, sender, time and body) are
+    ignored.
+    """
+
+    def __init__(self, path: str = ARCHIVE_FILE):
+        self.path = path
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        self._writer = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def add(self, number: str, messages: list) -> None:
+        if not messages:
+            return
+        now = time.time()
+        self._queue.put(
+            [
+                (
+                    message_key(number, m),
+                    text(number),
+                    text(m.get("FromNumber")),
+                    text(m.get("message_time")),
+                    parse_time(m.get("message_time"), now),
+                    text(m.get("Messagebody")),
+                    now,
+                )
+                for m in messages
+            ]
+        )
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, daemon=True)
+                    self._writer.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            rows = self._queue.get()
+            if rows is None:
+                break
+            stop = False
+            deadline = time.monotonic() + BATCH_WAIT
+            while len(rows) < BATCH_SIZE:
+                try:
+                    more = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if more is None:
+                    stop = True
+                    break
+                rows.extend(more)
+            try:
+                conn = self._connect()
+                with conn:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO messages (key, number, from_number, "
+                        "message_time, message_epoch, body, fetched) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+            except Exception as e:
+                log_error(f"Archiving {len(rows)} messages failed: {e}")
+            if stop:
+                break
+
+    def flush(self) -> None:
+        """Write everything queued so far and stop the writer thread."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join()
+
+    def search(self, text: str, number: str = None, from_number: str = None, since: float = None, limit: int = 50) -> list:
+        """Best matches for ``text``, optionally limited to a receiving number,
+        a sender and a start epoch. With no ``text`` but a number or sender,
+        returns that number's or sender's newest messages."""
+        expression = match_expression(text)
+        if expression:
+            sql = (
+                "SELECT m.number, m.from_number, m.message_time, m.body "
+                "FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid "
+                "WHERE messages_fts MATCH ?"
+            )
+            args = [expression]
+        elif number is not None or from_number is not None:
+            sql = (
+                "SELECT m.number, m.from_number, m.message_time, m.body "
+                "FROM messages m WHERE 1"
+            )
+            args = []
+        else:
+            return []
+        if number is not None:
+            sql += " AND m.number = ?"
+            args.append(number)
+        if from_number is not None:
+            sql += " AND m.from_number = ?"
+            args.append(from_number)
+        if since is not None:
+            sql += " AND m.message_epoch >= ?"
+            args.append(since)
+        if expression:
+            sql += " ORDER BY bm25(messages_fts) LIMIT ?"
+        else:
+            sql += " ORDER BY m.message_epoch DESC LIMIT ?"
+        args.append(limit)
+        return [dict(row) for row in self._connect().execute(sql, args)]
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT count(*) FROM messages").fetchone()[0]
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_archive() -> MessageArchive:
+    global _archive
+    if _archive is None:
+        with _archive_lock:
+            if _archive is None:
+                _archive = MessageArchive()
+                atexit.register(_archive.flush)
+    return _archive
+
+
+def format_match(match: dict) -> str:
+    return (
+        f"Number: {match['number']}\n"
+        f"From: {match['from_number']}\n"
+        f"Time: {match['message_time']}\n"
+        f"Message: {match['body']}\n"
+        f"{'-' * 50}\n"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search every message ever fetched")
+    parser.add_argument("query", nargs="?", default="", help="words to look for")
+    parser.add_argument("--number", help="only messages received by this number")
+    parser.add_argument("--from", dest="from_number", help="only messages sent by this sender")
+    parser.add_argument("--days", type=float, help="only messages from the last N days")
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    since = time.time() - args.days * 86400 if args.days is not None else None
+    start = time.perf_counter()
+    matches = get_archive().search(
+        args.query, args.number, args.from_number, since, args.limit
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+    for match in matches:
+        print(format_match(match), end="")
+    print(f"{len(matches)} matches in {elapsed:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
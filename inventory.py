@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+# coding: utf-8
+# Cross-country number inventory: crawls every country, indexes the result
+# by country, E.164 prefix and age so lookups never touch the API.
+
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from timeparse import parse_time
+
+INVENTORY_FILE = "inventory.json"
+
+
+def number_of(record: dict) -> str:
+    return (
+        record.get("E.164")
+        or record.get("number")
+        or record.get("phone_number", "Unknown")
+    )
+
+
+def fingerprint(page: dict) -> str:
+    numbers = sorted(number_of(i) for i in page.get("Available_numbers", []))
+    digest = hashlib.sha1()
+    digest.update(str(page.get("Total_Pages", 0)).encode())
+    for number in numbers:
+        digest.update(number.encode())
+    return digest.hexdigest()
+
+
+def digits(number: str) -> str:
+    return "".join(c for c in number if c.isdigit())
+
+
+class NumberInventory:
+    """Numbers of every country, indexed for lookups by country, prefix and age.
+
+    Each record is the raw API entry plus ``country``, ``number``, ``added``
+    (epoch the number appeared, from the API when parseable, otherwise the
+    crawl that first saw it) and ``seen`` (last crawl that returned it).
+    """
+
+    def __init__(self):
+        self.records = {}
+        self.fingerprints = {}
+        self._lock = threading.Lock()
+        self._by_country = {}
+        self._by_digits = []
+        self._by_added = []
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def replace_country(self, country: str, numbers: list, digest: str, now: float = None) -> None:
+        now = time.time() if now is None else now
+        with self._lock:
+            old = self._by_country.get(country.lower(), set())
+            fresh = {}
+            for raw in numbers:
+                number = number_of(raw)
+                if number == "Unknown":
+                    continue
+                known = self.records.get(number)
+                added = parse_time(raw.get("time") or raw.get("created_at"), now)
+                if added is None:
+                    added = known["added"] if known else now
+                fresh[number] = dict(
+                    raw, country=country, number=number, added=added, seen=now
+                )
+            for number in old - fresh.keys():
+                del self.records[number]
+            self.records.update(fresh)
+            self.fingerprints[country] = digest
+            self._reindex()
+
+    def _reindex(self) -> None:
+        by_country = {}
+        for number, record in self.records.items():
+            by_country.setdefault(record["country"].lower(), set()).add(number)
+        self._by_country = by_country
+        self._by_digits = sorted((digits(n), n) for n in self.records)
+        self._by_added = sorted((r["added"], n) for n, r in self.records.items())
+
+    def query(self, country: str = None, prefix: str = None, max_age: float = None, now: float = None) -> list:
+        """Records matching every given filter, newest first."""
+        with self._lock:
+            candidates = None
+            if country is not None:
+                candidates = self._by_country.get(country.lower(), set())
+            if prefix is not None:
+                key = digits(prefix)
+                lo = bisect.bisect_left(self._by_digits, (key,))
+                hi = bisect.bisect_left(self._by_digits, (key + "\x7f",))
+                matched = {n for _, n in self._by_digits[lo:hi]}
+                candidates = matched if candidates is None else candidates & matched
+            if max_age is not None:
+                since = (time.time() if now is None else now) - max_age
+                lo = bisect.bisect_left(self._by_added, (since,))
+                matched = {n for _, n in self._by_added[lo:]}
+                candidates = matched if candidates is None else candidates & matched
+            if candidates is None:
+                candidates = self.records.keys()
+            found = [self.records[n] for n in candidates]
+        found.sort(key=lambda r: r["added"], reverse=True)
+        return found
+
+    def save(self, path: str = INVENTORY_FILE) -> None:
+        with self._lock:
+            data = {
+                "fingerprints": self.fingerprints,
+                "records": list(self.records.values()),
+            }
+        tmp = path + ".tmp"
+        with open(tmp, "w") as file:
+            json.dump(data, file)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = INVENTORY_FILE) -> "NumberInventory":
+        inventory = cls()
+        if not os.path.exists(path):
+            return inventory
+        with open(path) as file:
+            data = json.load(file)
+        inventory.fingerprints = data.get("fingerprints", {})
+        inventory.records = {r["number"]: r for r in data.get("records", [])}
+        inventory._reindex()
+        return inventory
+
+
+class InventoryCrawler:
+    """Crawls all pages of all countries with at most ``workers`` requests in flight.
+
+    A refresh first fetches page 1 of every country; countries whose first
+    page has the same fingerprint as last time are left untouched, the rest
+    have their remaining pages fetched and their records replaced.
+    """
+
+    def __init__(self, inventory: NumberInventory, fetch_countries, fetch_numbers, workers: int = 8, max_pages: int = None):
+        self.inventory = inventory
+        self.fetch_countries = fetch_countries
+        self.fetch_numbers = fetch_numbers
+        self.workers = workers
+        self.max_pages = max_pages
+
+    def _fetch(self, country: str, page: int) -> dict:
+        """A page of numbers, or None if ``fetch_numbers`` raised.
+
+        ``fetch_numbers`` must raise on failures: an empty page is taken to
+        mean the country has no numbers left and clears it.
+        """
+        try:
+            return self.fetch_numbers(country, page)
+        except Exception:
+            return None
+
+    def refresh(self) -> list:
+        """Re-crawl changed countries, returning their names.
+
+        A country any of whose pages failed keeps its previous records and
+        fingerprint, so it is retried on the next refresh.
+        """
+        countries = [c["Country_Name"] for c in self.fetch_countries()]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            first_pages = dict(
+                zip(countries, pool.map(lambda c: self._fetch(c, 1), countries))
+            )
+            changed = {}
+            for country, page in first_pages.items():
+                if page is None:
+                    continue
+                digest = fingerprint(page)
+                if self.inventory.fingerprints.get(country) != digest:
+                    changed[country] = digest
+            jobs = []
+            for country in changed:
+                total = first_pages[country]["Total_Pages"]
+                if self.max_pages is not None:
+                    total = min(total, self.max_pages)
+                jobs.extend((country, page) for page in range(2, total + 1))
+            pages = pool.map(lambda job: self._fetch(*job), jobs)
+            numbers = {
+                c: list(first_pages[c].get("Available_numbers", [])) for c in changed
+            }
+            for (country, _), page in zip(jobs, pages):
+                if page is None:
+                    changed.pop(country, None)
+                elif country in changed:
+                    numbers[country].extend(page.get("Available_numbers", []))
+        now = time.time()
+        for country, digest in changed.items():
+            self.inventory.replace_country(country, numbers[country], digest, now)
+        return list(changed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the cross-country number inventory")
+    parser.add_argument("--file", default=INVENTORY_FILE, help="inventory file")
+    parser.add_argument("--refresh", action="store_true", help="re-crawl changed countries first")
+    parser.add_argument("--workers", type=int, default=8, help="parallel requests while crawling")
+    parser.add_argument("--max-pages", type=int, help="pages to crawl per country")
+    parser.add_argument("--country", help="country name, e.g. 'United Kingdom'")
+    parser.add_argument("--prefix", help="E.164 prefix, e.g. +447")
+    parser.add_argument("--max-age", type=float, help="only numbers added in the last N seconds")
+    args = parser.parse_args()
+
+    inventory = NumberInventory.load(args.file)
+    if args.refresh or not len(inventory):
+        from tempsms import fetch_countries, fetch_numbers_page
+
+        crawler = InventoryCrawler(
+            inventory, fetch_countries, fetch_numbers_page, args.workers, args.max_pages
+        )
+        changed = crawler.refresh()
+        inventory.save(args.file)
+        print(f"Re-crawled {len(changed)} countries, {len(inventory)} numbers in inventory")
+    start = time.perf_counter()
+    found = inventory.query(args.country, args.prefix, args.max_age)
+    elapsed = (time.perf_counter() - start) * 1e6
+    for record in found:
+        added = datetime.fromtimestamp(record["added"]).strftime("%Y-%m-%d %H:%M:%S")
+        print(f'{record["number"]}\t{record["country"]}\t{added}')
+    print(f"{len(found)} numbers in {elapsed:.0f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# coding: utf-8
+# Pool of decrypted auth keys: requests rotate across healthy keys, throttled
+# keys sit out a cool-down, and the pool is topped up in the background.
+#
+#   TEMPSMS_KEYS=n               keys to hold (default 1)
+#   TEMPSMS_KEY_LIST=k1,k2,...   distinct keys to start with, for when the
+#                                upstream keeps handing out the same one
+#   TEMPSMS_KEY_COOLDOWN=s       seconds a throttled key is skipped (default 60)
+#   TEMPSMS_KEY_REFRESH=s        background refresh period, 0 disables (default 600)
+
+import os
+import sys
+import threading
+import time
+
+KEY_POOL_SIZE = int(os.environ.get("TEMPSMS_KEYS", "1"))
+KEY_COOLDOWN = float(os.environ.get("TEMPSMS_KEY_COOLDOWN", "60"))
+KEY_REFRESH = float(os.environ.get("TEMPSMS_KEY_REFRESH", "600"))
+KEY_LIST = [k.strip() for k in os.environ.get("TEMPSMS_KEY_LIST", "").split(",") if k.strip()]
+THROTTLED = (429,)
+REVOKED = (401, 403)
+
+
+def log_error(message: str) -> None:
+    if sys.stderr is not None:
+        print(f"[!] {message}", file=sys.stderr)
+
+
+class KeyPool:
+    """Round-robin over up to ``size`` distinct keys from ``fetch_key``.
+
+    ``keys`` are taken as given and count towards ``size``. The rest of the
+    pool is filled on first use, not on construction, so importing the
+    module that owns it costs no request. ``stats`` holds, per key, the
+    requests sent with it, how often it was throttled and the epoch until
+    which it is quarantined.
+    """
+
+    def __init__(self, fetch_key, size: int = KEY_POOL_SIZE, cooldown: float = KEY_COOLDOWN, refresh: float = KEY_REFRESH, keys: list = KEY_LIST):
+        self.fetch_key = fetch_key
+        self.size = max(1, size, len(keys))
+        self.cooldown = cooldown
+        self.refresh = refresh
+        self.stats = {}
+        self._keys = []
+        self._next = 0
+        self._lock = threading.Lock()
+        self._fill_lock = threading.Lock()
+        self._refresher = None
+        self._warned = False
+        self._topping_up = False
+        for key in keys:
+            self._add(key)
+
+    def _add(self, key: str) -> bool:
+        with self._lock:
+            if key in self.stats or len(self._keys) >= self.size:
+                return False
+            self._keys.append(key)
+            self.stats[key] = {"requests": 0, "throttled": 0, "until": 0.0}
+            return True
+
+    def fill(self) -> None:
+        """Fetch keys until the pool is full; gives up after ``2 * size`` tries
+        since the upstream may hand out the same key repeatedly."""
+        with self._fill_lock:
+            for _ in range(2 * self.size):
+                if len(self._keys) >= self.size:
+                    break
+                self._add(self.fetch_key())
+            short = len(self._keys) < self.size
+        if short and not self._warned:
+            self._warned = True
+            log_error(
+                f"Only {len(self._keys)} of {self.size} auth keys are distinct; "
+                "set TEMPSMS_KEY_LIST to supply more"
+            )
+        if self.refresh > 0 and self._refresher is None:
+            self._refresher = threading.Thread(target=self._refresh_loop, daemon=True)
+            self._refresher.start()
+
+    def acquire(self) -> str:
+        """The next healthy key, or the one whose cool-down ends first."""
+        for _ in range(3):
+            if not self._keys:
+                self.fill()
+            now = time.time()
+            with self._lock:
+                count = len(self._keys)
+                if not count:
+                    # Emptied by a discard since fill(); fill again
+                    continue
+                for offset in range(count):
+                    key = self._keys[(self._next + offset) % count]
+                    if self.stats[key]["until"] <= now:
+                        self._next = (self._next + offset + 1) % count
+                        break
+                else:
+                    key = min(self._keys, key=lambda k: self.stats[k]["until"])
+                self.stats[key]["requests"] += 1
+                return key
+        raise LookupError("No auth key available")
+
+    def report(self, key: str, status_code: int) -> None:
+        """Feed back the HTTP status a request made with ``key`` got."""
+        if status_code in THROTTLED:
+            with self._lock:
+                if key in self.stats:
+                    self.stats[key]["throttled"] += 1
+                    self.stats[key]["until"] = time.time() + self.cooldown
+        elif status_code in REVOKED:
+            self.discard(key)
+            # Replace the revoked key now rather than on the next refresh
+            with self._lock:
+                start = len(self._keys) < self.size and not self._topping_up
+                self._topping_up = self._topping_up or start
+            if start:
+                threading.Thread(target=self._top_up, daemon=True).start()
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            if key in self.stats:
+                self._keys.remove(key)
+                del self.stats[key]
+                self._next = 0
+
+    def _top_up(self) -> None:
+        try:
+            self.fill()
+        except Exception as e:
+            log_error(f"Refilling the key pool failed: {e}")
+        finally:
+            self._topping_up = False
+
+    def _refresh_loop(self) -> None:
+        while True:
+            time.sleep(self.refresh)
+            try:
+                key = self.fetch_key()
+                with self._lock:
+                    now = time.time()
+                    quarantined = [k for k in self._keys if self.stats[k]["until"] > now]
+                    victim = None
+                    if key not in self.stats and len(self._keys) >= self.size and quarantined:
+                        victim = max(quarantined, key=lambda k: self.stats[k]["until"])
+                if victim is not None:
+                    self.discard(victim)
+                self._add(key)
+            except Exception:
+                continue
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# coding: utf-8
+# Launch-to-first-window time of the Tk GUI, e.g. one-file vs one-dir build:
+#
+#   python measure_startup.py dist/TempSMS.exe dist/TempSMS/TempSMS.exe
+#   python measure_startup.py "python temp_sms_gui_tk.py"
+
+import argparse
+import os
+import shlex
+import statistics
+import subprocess
+import tempfile
+import time
+
+
+def measure(command: list, timeout: float) -> float:
+    """Seconds from launching ``command`` until the GUI writes its startup marker."""
+    with tempfile.TemporaryDirectory() as tmp:
+        marker = os.path.join(tmp, "started")
+        env = dict(os.environ, TEMPSMS_STARTUP_MARKER=marker)
+        start = time.time()
+        process = subprocess.Popen(
+            command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                if os.path.exists(marker):
+                    with open(marker) as file:
+                        stamp = file.read().strip()
+                    if stamp:
+                        return float(stamp) - start
+                if process.poll() is not None:
+                    raise RuntimeError(f"{command[0]} exited with {process.returncode} before showing a window")
+                time.sleep(0.01)
+            raise TimeoutError(f"{command[0]} showed no window within {timeout}s")
+        finally:
+            process.kill()
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure launch-to-first-window time of the Tk GUI")
+    parser.add_argument("commands", nargs="+", help="executables or quoted command lines to compare")
+    parser.add_argument("-n", "--runs", type=int, default=5, help="launches per command")
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    for command in args.commands:
+        argv = shlex.split(command, posix=os.name != "nt")
+        times = [measure(argv, args.timeout) for _ in range(args.runs)]
+        print(
+            f"{command}: min {min(times):.3f}s  median {statistics.median(times):.3f}s  "
+            f"max {max(times):.3f}s  ({args.runs} runs, first {times[0]:.3f}s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
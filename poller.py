@@ -0,0 +1,286 @@
+#!/usr/bin/env python
+# coding: utf-8
+# Sharded multi-process polling for large watch sets: numbers are consistently
+# hashed to worker processes, each polling its shard over its own connection
+# pool, and new messages come back to the parent as one ordered stream.
+#
+#   python poller.py numbers.txt --workers 8 --interval 5
+
+import argparse
+import bisect
+import hashlib
+import multiprocessing
+import os
+import queue
+import time
+
+from archive import log_error, message_key
+from timeparse import parse_time
+
+RESTART_BACKOFF = 1.0
+RESTART_BACKOFF_MAX = 60.0
+HEALTHY_RUN = 60.0
+
+
+def ring_hash(key: str) -> int:
+    return int(hashlib.md5(key.encode()).hexdigest()[:16], 16)
+
+
+class HashRing:
+    """Consistent hash ring; adding a worker only moves ~1/n of the numbers."""
+
+    def __init__(self, vnodes: int = 64):
+        self.vnodes = vnodes
+        self._points = []
+
+    def add(self, worker: int) -> None:
+        for i in range(self.vnodes):
+            bisect.insort(self._points, (ring_hash(f"{worker}:{i}"), worker))
+
+    def remove(self, worker: int) -> None:
+        self._points = [p for p in self._points if p[1] != worker]
+
+    def owner(self, key: str) -> int:
+        i = bisect.bisect(self._points, (ring_hash(key), -1)) % len(self._points)
+        return self._points[i][1]
+
+
+def poll_worker(worker: int, control, out, interval: float) -> None:
+    """Worker process loop.
+
+    Runs in a freshly spawned interpreter, so ``tempsms`` builds its own
+    transport (and connection pool) and key pool. ``control`` carries shard
+    assignments ``{number: seen keys or None}`` and finally ``None`` to stop.
+    A number handed over with its seen keys carries on where its previous
+    owner left off; one handed over with ``None`` has never been polled, so
+    its first poll only records what is there, reported as
+    ``("baseline", worker, number, keys)``. Later polls send new messages as
+    ``("messages", worker, [(epoch, number, key, message), ...])``, and
+    ``("cycle", worker)`` follows once the whole shard was polled.
+    """
+    from archive import get_archive
+    from tempsms import fetch_sms
+
+    numbers = {}
+    last_error = None
+
+    def receive(command) -> bool:
+        nonlocal numbers
+        if command is None:
+            return False
+        assigned = {}
+        for number, keys in command.items():
+            if numbers.get(number) is not None:
+                assigned[number] = numbers[number]
+            else:
+                assigned[number] = None if keys is None else set(keys)
+        numbers = assigned
+        return True
+
+    running = True
+    while running:
+        started = time.monotonic()
+        for number in list(numbers):
+            try:
+                while running:
+                    running = receive(control.get_nowait())
+            except queue.Empty:
+                pass
+            if not running:
+                break
+            if number not in numbers:
+                continue
+            try:
+                messages = fetch_sms(number)
+            except Exception as e:
+                # Log each distinct failure once, not once per number per cycle
+                if str(e) != last_error:
+                    last_error = str(e)
+                    log_error(f"Worker {worker}: polling {number} failed: {e}")
+                continue
+            last_error = None
+            now = time.time()
+            known = numbers[number]
+            fresh = []
+            keys = set()
+            for message in messages:
+                key = message_key(number, message)
+                keys.add(key)
+                if known is not None and key not in known:
+                    epoch = parse_time(message.get("message_time"), now)
+                    fresh.append((now if epoch is None else epoch, number, key, message))
+            if known is None:
+                out.put(("baseline", worker, number, list(keys)))
+            # Only what the API still returns can come back; older keys are
+            # dropped so the set stays one page long
+            numbers[number] = keys
+            if fresh:
+                out.put(("messages", worker, fresh))
+        else:
+            out.put(("cycle", worker))
+            try:
+                wait = max(0, interval - (time.monotonic() - started))
+                running = receive(control.get(timeout=wait))
+            except queue.Empty:
+                pass
+    get_archive().flush()
+
+
+class ShardedPoller:
+    """Polls ``numbers`` from ``workers`` processes and merges their output.
+
+    Messages are buffered until every live worker has finished a polling
+    cycle (or ``3 * interval`` has passed), then released sorted by message
+    time, so the stream is ordered across shards. Crashed workers are
+    restarted with the same shard, after a delay that doubles (up to a
+    minute) while they keep dying within a minute of starting;
+    ``add_worker`` rebalances via the ring.
+    The parent keeps every number's seen message keys and hands them over
+    with the number, so restarts and rebalancing neither drop nor repeat
+    messages.
+    """
+
+    def __init__(self, numbers, workers: int = None, interval: float = 5.0, vnodes: int = 64):
+        self.numbers = list(dict.fromkeys(numbers))
+        self.interval = interval
+        self.restarts = 0
+        self._context = multiprocessing.get_context("spawn")
+        self._out = self._context.Queue()
+        self._ring = HashRing(vnodes)
+        self._processes = {}
+        self._controls = {}
+        self._shards = {}
+        self._seen = {}
+        self._started_at = {}
+        self._failures = {}
+        self._restart_at = {}
+        for _ in range(workers or os.cpu_count() or 1):
+            self._ring.add(len(self._controls))
+            self._controls[len(self._controls)] = None
+
+    def _start(self, worker: int) -> None:
+        self._controls[worker] = self._context.Queue()
+        self._controls[worker].put(self._assignment(self._shards.get(worker, [])))
+        process = self._context.Process(
+            target=poll_worker,
+            args=(worker, self._controls[worker], self._out, self.interval),
+            daemon=True,
+        )
+        process.start()
+        self._processes[worker] = process
+        self._started_at[worker] = time.monotonic()
+
+    def _assignment(self, shard: list) -> dict:
+        return {n: list(self._seen[n]) if n in self._seen else None for n in shard}
+
+    def _rebalance(self) -> None:
+        shards = {worker: [] for worker in self._controls}
+        for number in self.numbers:
+            shards[self._ring.owner(number)].append(number)
+        for worker, shard in shards.items():
+            if shard != self._shards.get(worker) and worker in self._processes:
+                self._controls[worker].put(self._assignment(shard))
+        self._shards = shards
+
+    def start(self) -> None:
+        self._rebalance()
+        for worker in self._controls:
+            self._start(worker)
+
+    def add_worker(self) -> int:
+        worker = len(self._controls)
+        self._controls[worker] = None
+        self._ring.add(worker)
+        self._rebalance()
+        self._start(worker)
+        return worker
+
+    def watch(self, numbers) -> None:
+        self.numbers = list(dict.fromkeys(self.numbers + list(numbers)))
+        self._rebalance()
+
+    def stop(self) -> None:
+        for worker in self._processes:
+            self._controls[worker].put(None)
+        for process in self._processes.values():
+            # Workers check for the stop between numbers, then flush their
+            # archive writes; only a worker stuck in a request gets killed
+            process.join(timeout=30)
+            if process.is_alive():
+                process.kill()
+        self._processes.clear()
+
+    def _check_workers(self) -> None:
+        now = time.monotonic()
+        for worker, process in list(self._processes.items()):
+            if process.is_alive():
+                continue
+            if worker not in self._restart_at:
+                if now - self._started_at[worker] >= HEALTHY_RUN:
+                    self._failures[worker] = 0
+                failures = self._failures.get(worker, 0)
+                self._failures[worker] = failures + 1
+                delay = min(RESTART_BACKOFF_MAX, RESTART_BACKOFF * 2 ** failures)
+                self._restart_at[worker] = now + delay
+                log_error(f"Worker {worker} exited with {process.exitcode}, restarting in {delay:.0f}s")
+            elif now >= self._restart_at[worker]:
+                del self._restart_at[worker]
+                self.restarts += 1
+                self._start(worker)
+
+    def messages(self):
+        """Yield ``(number, message)`` for every new message, in time order."""
+        pending = []
+        reported = set()
+        last_flush = time.monotonic()
+        while True:
+            try:
+                event = self._out.get(timeout=min(1.0, self.interval))
+            except queue.Empty:
+                event = None
+            if event is not None and event[0] == "messages":
+                for epoch, number, key, message in event[2]:
+                    seen = self._seen.setdefault(number, set())
+                    if key not in seen:
+                        seen.add(key)
+                        pending.append((epoch, number, message))
+            elif event is not None and event[0] == "baseline":
+                self._seen.setdefault(event[2], set()).update(event[3])
+            elif event is not None and event[0] == "cycle":
+                reported.add(event[1])
+            self._check_workers()
+            due = time.monotonic() - last_flush > 3 * self.interval
+            if reported >= self._processes.keys() or due:
+                pending.sort(key=lambda entry: entry[0])
+                for _, number, message in pending:
+                    yield number, message
+                pending = []
+                reported = set()
+                last_flush = time.monotonic()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Poll many numbers from several processes")
+    parser.add_argument("file", help="file with one number per line")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between polls of a number")
+    args = parser.parse_args()
+
+    with open(args.file) as file:
+        numbers = [line.strip() for line in file if line.strip()]
+    poller = ShardedPoller(numbers, args.workers, args.interval)
+    poller.start()
+    try:
+        for number, message in poller.messages():
+            print(
+                f"{number}\t{message['FromNumber']}\t{message['message_time']}\t"
+                f"{message['Messagebody']!r}"
+            )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        poller.stop()
+
+
+if __name__ == "__main__":
+    main()
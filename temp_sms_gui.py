@@ -1,12 +1,14 @@
 import sys
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                            QHBoxLayout, QComboBox, QLabel, QPushButton, 
-                           QListWidget, QTextEdit, QMessageBox, QProgressBar)
+                           QListWidget, QTextEdit, QMessageBox, QProgressBar,
+                           QLineEdit)
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from qt_material import apply_stylesheet
 import json
 from tempsms import (fetch_countries, fetch_numbers, fetch_sms, 
                     fetch_authkey, decrypt_key, copy_clipboard)
+from archive import get_archive, format_match
 
 class Worker(QThread):
     """Worker thread for async operations"""
@@ -46,6 +48,11 @@ class TempSMSApp(QMainWindow):
         top_section.addWidget(self.country_combo)
         top_section.addWidget(self.refresh_countries_btn)
         top_section.addStretch()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search archived messages")
+        self.search_btn = QPushButton("Search Archive")
+        top_section.addWidget(self.search_input)
+        top_section.addWidget(self.search_btn)
         layout.addLayout(top_section)
         
         # Create middle section for numbers
@@ -91,6 +98,8 @@ class TempSMSApp(QMainWindow):
         self.country_combo.currentIndexChanged.connect(self.on_country_changed)
         self.numbers_list.currentItemChanged.connect(self.on_number_selected)
         self.copy_btn.clicked.connect(self.copy_selected_number)
+        self.search_btn.clicked.connect(self.search_archive)
+        self.search_input.returnPressed.connect(self.search_archive)
         
         # Initial load
         self.load_countries()
@@ -192,6 +201,33 @@ class TempSMSApp(QMainWindow):
         worker.error.connect(on_error)
         worker.start()
     
+    def search_archive(self):
+        query = self.search_input.text().strip()
+        if not query:
+            return
+        
+        self.status_bar.setFormat("Searching archive...")
+        self.status_bar.setRange(0, 0)
+        
+        def on_finished(matches):
+            self.messages_area.clear()
+            for match in matches:
+                self.messages_area.append(format_match(match))
+            self.status_bar.setRange(0, 100)
+            self.status_bar.setValue(100)
+            self.status_bar.setFormat(f"{len(matches)} archived messages found")
+        
+        def on_error(error_msg):
+            self.status_bar.setRange(0, 100)
+            self.status_bar.setValue(0)
+            self.status_bar.setFormat("Error searching archive")
+            QMessageBox.critical(self, "Error", f"Failed to search archive: {error_msg}")
+        
+        self.search_worker = Worker(get_archive().search, query)
+        self.search_worker.finished.connect(on_finished)
+        self.search_worker.error.connect(on_error)
+        self.search_worker.start()
+    
     def copy_selected_number(self):
         current = self.numbers_list.currentItem()
         if not current:
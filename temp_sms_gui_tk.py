@@ -3,10 +3,13 @@ from tkinter import ttk, messagebox, scrolledtext
 import threading
 import sys
 import os
+import time
 import traceback
 
 # Add debug logging
 def debug_log(message):
+    if sys.stderr is None:  # windowed frozen build has no console
+        return
     print(f"DEBUG: {message}", file=sys.stderr)
     sys.stderr.flush()
 
@@ -14,6 +17,7 @@ try:
     debug_log("Starting imports...")
     from tempsms import (fetch_countries, fetch_numbers, fetch_sms, 
                         fetch_authkey, decrypt_key, copy_clipboard)
+    from archive import get_archive, format_match
     debug_log("Imports successful")
 except Exception as e:
     debug_log(f"Import error: {str(e)}")
@@ -50,6 +54,12 @@ class TempSMSApp:
             refresh_countries_btn = ttk.Button(top_frame, text="Refresh Countries", command=self.load_countries)
             refresh_countries_btn.pack(side=tk.LEFT)
             
+            search_btn = ttk.Button(top_frame, text="Search Archive", command=self.search_archive)
+            search_btn.pack(side=tk.RIGHT)
+            self.search_entry = ttk.Entry(top_frame, width=30)
+            self.search_entry.pack(side=tk.RIGHT, padx=(0, 5))
+            self.search_entry.bind('<Return>', lambda e: self.search_archive())
+            
             # Middle section - Numbers and Messages
             # Numbers List
             numbers_frame = ttk.LabelFrame(main_frame, text="Available Numbers", padding="5")
@@ -207,6 +217,31 @@ class TempSMSApp:
             debug_log(f"Error in on_number_selected: {str(e)}")
             self.show_error(f"Failed to load messages: {str(e)}")
         
+    def search_archive(self):
+        try:
+            query = self.search_entry.get().strip()
+            if not query:
+                return
+                
+            debug_log("Searching archive...")
+            self.status_var.set("Searching archive...")
+            
+            def on_complete(matches):
+                try:
+                    self.messages_area.delete(1.0, tk.END)
+                    for match in matches:
+                        self.messages_area.insert(tk.END, format_match(match))
+                    self.status_var.set(f"{len(matches)} archived messages found")
+                    debug_log("Archive searched successfully")
+                except Exception as e:
+                    debug_log(f"Error processing search results: {str(e)}")
+                    self.show_error(f"Error processing search results: {str(e)}")
+            
+            self.run_async(get_archive().search, on_complete, query)
+        except Exception as e:
+            debug_log(f"Error in search_archive: {str(e)}")
+            self.show_error(f"Failed to search archive: {str(e)}")
+        
     def copy_selected_number(self):
         try:
             selection = self.numbers_list.curselection()
@@ -231,6 +266,13 @@ if __name__ == "__main__":
         debug_log("Starting application...")
         root = tk.Tk()
         app = TempSMSApp(root)
+        marker = os.environ.get("TEMPSMS_STARTUP_MARKER")
+        if marker:
+            # Read by measure_startup.py once the first window is drawn
+            def write_marker():
+                with open(marker, "w") as file:
+                    file.write(str(time.time()))
+            root.after_idle(write_marker)
         debug_log("Application initialized, starting mainloop")
         root.mainloop()
     except Exception as e:
@@ -3,28 +3,36 @@
 # By Kickwinnerz: https://github.com/Kickwinnerz,https://t.me/Kickwinnerz
 
 import os
+import shutil
 import subprocess
 import random
 import time
 import sys
 import base64
+import functools
+import threading
+
+FROZEN = getattr(sys, "frozen", False)
 
 
 def warn(message: str) -> None:
-    print(f"\x1b[1m\x1b[31m[!] {message}".center(os.get_terminal_size().columns))
+    print(f"\x1b[1m\x1b[31m[!] {message}".center(shutil.get_terminal_size().columns))
 
 
 def info(message: str) -> None:
-    print(f"\x1b[1m\x1b[92m[+] {message}".center(os.get_terminal_size().columns))
+    print(f"\x1b[1m\x1b[92m[+] {message}".center(shutil.get_terminal_size().columns))
 
 
 try:
     from Crypto.Cipher import AES
     from Crypto.Util.Padding import unpad
     import requests
-    import colorama
-    import pyfiglet
     import pyperclip
+
+    if not FROZEN:
+        # Terminal only; left out of the frozen GUI build
+        import colorama
+        import pyfiglet
 except ModuleNotFoundError:
     try:
         subprocess.check_call(
@@ -38,19 +46,26 @@ except ModuleNotFoundError:
         info("Dependencies Installed")
         info("Run the Program Again")
         exit()
-BLU = colorama.Style.BRIGHT + colorama.Fore.BLUE
-CYA = colorama.Style.BRIGHT + colorama.Fore.CYAN
-GRE = colorama.Style.BRIGHT + colorama.Fore.GREEN
-YEL = colorama.Style.BRIGHT + colorama.Fore.YELLOW
-RED = colorama.Style.BRIGHT + colorama.Fore.RED
-MAG = colorama.Style.BRIGHT + colorama.Fore.MAGENTA
-LIYEL = colorama.Style.BRIGHT + colorama.Fore.LIGHTYELLOW_EX
-LIRED = colorama.Style.BRIGHT + colorama.Fore.LIGHTRED_EX
-LIMAG = colorama.Style.BRIGHT + colorama.Fore.LIGHTMAGENTA_EX
-LIBLU = colorama.Style.BRIGHT + colorama.Fore.LIGHTBLUE_EX
-LICYA = colorama.Style.BRIGHT + colorama.Fore.LIGHTCYAN_EX
-LIGRE = colorama.Style.BRIGHT + colorama.Fore.LIGHTGREEN_EX
-BOLD = colorama.Style.BRIGHT
+from archive import get_archive
+from transport import get_transport
+from keypool import KeyPool
+
+if FROZEN:
+    BLU = CYA = GRE = YEL = RED = MAG = LIYEL = LIRED = LIMAG = LIBLU = LICYA = LIGRE = BOLD = ""
+else:
+    BLU = colorama.Style.BRIGHT + colorama.Fore.BLUE
+    CYA = colorama.Style.BRIGHT + colorama.Fore.CYAN
+    GRE = colorama.Style.BRIGHT + colorama.Fore.GREEN
+    YEL = colorama.Style.BRIGHT + colorama.Fore.YELLOW
+    RED = colorama.Style.BRIGHT + colorama.Fore.RED
+    MAG = colorama.Style.BRIGHT + colorama.Fore.MAGENTA
+    LIYEL = colorama.Style.BRIGHT + colorama.Fore.LIGHTYELLOW_EX
+    LIRED = colorama.Style.BRIGHT + colorama.Fore.LIGHTRED_EX
+    LIMAG = colorama.Style.BRIGHT + colorama.Fore.LIGHTMAGENTA_EX
+    LIBLU = colorama.Style.BRIGHT + colorama.Fore.LIGHTBLUE_EX
+    LICYA = colorama.Style.BRIGHT + colorama.Fore.LIGHTCYAN_EX
+    LIGRE = colorama.Style.BRIGHT + colorama.Fore.LIGHTGREEN_EX
+    BOLD = colorama.Style.BRIGHT
 CLEAR = "cls" if os.name == "nt" else "clear"
 COLORS = BLU, CYA, GRE, YEL, RED, MAG, LIYEL, LIRED, LIMAG, LIBLU, LICYA, LIGRE
 FONTS = (
@@ -64,39 +79,98 @@ FONTS = (
     "avatar",
 )  #'poison'
 HEADERS = {"accept-encoding": "gzip", "user-agent": "okhttp/4.9.2"}
+NUMBERS_TTL = 300  # seconds a country's number list is reused by main()
 global font
 font = random.choice(FONTS)
-colorama.init(autoreset=True)
+TRANSPORT = get_transport()
+if not FROZEN:
+    colorama.init(autoreset=True)
 
 
 def logo() -> None:
     os.system(CLEAR)
+    if FROZEN:
+        # No colors or pyfiglet in the frozen build
+        print("Temp SMS".center(shutil.get_terminal_size().columns), end="\n" * 2)
+        return
     color1 = random.choice(COLORS)
     color2 = random.choice(COLORS)
     while color1 == color2:
         color2 = random.choice(COLORS)
-    print(color1 + "_" * os.get_terminal_size().columns, end="\n" * 2)
+    print(color1 + "_" * shutil.get_terminal_size().columns, end="\n" * 2)
     print(
         color2
         + pyfiglet.figlet_format(
             "Temp\nSMS",
             font=font,
             justify="center",
-            width=os.get_terminal_size().columns,
+            width=shutil.get_terminal_size().columns,
         ),
         end="",
     )
     msg = "[+] By Sandaru Ashen"
-    _ = int(os.get_terminal_size().columns / 2)
+    _ = int(shutil.get_terminal_size().columns / 2)
     _ -= int(len(msg) / 2)
     print(color1 + "_" * _ + LIYEL + msg + color1 + "_" * _ + "\n")
 
 
+class SingleFlight:
+    """Collapses concurrent identical calls into one request.
+
+    Callers arriving while a call with the same key is in flight wait for
+    it and get its result (or exception) instead of sending their own.
+    ``hits`` counts such shared calls, ``misses`` the ones actually made.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {"done": threading.Event()}
+                self.misses += 1
+            else:
+                self.hits += 1
+        if not leader:
+            call["done"].wait()
+            if "error" in call:
+                raise call["error"]
+            return call["result"]
+        try:
+            call["result"] = func(*args, **kwargs)
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["done"].set()
+        return call["result"]
+
+
+SINGLE_FLIGHT = SingleFlight()
+
+
+def single_flight(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (func.__name__, args, tuple(sorted(kwargs.items())))
+        return SINGLE_FLIGHT.do(key, func, *args, **kwargs)
+
+    return wrapper
+
+
 def fetch_authkey() -> str:
     url = "https://api-1.online/post/"
     params = {"action": "get_encrypted_api_key", "type": "user"}
     json = {"api": "111"}
-    rq = requests.post(url, params=params, headers=HEADERS, json=json)
+    rq = TRANSPORT.post(url, params=params, headers=HEADERS, json=json)
     return rq.json()["api_key"]
 
 
@@ -114,7 +188,7 @@ def decrypt_key(encrypted_str: str) -> str:
     return decrypted_data.decode()
 
 
-AUTH_KEY = decrypt_key(fetch_authkey())
+KEY_POOL = KeyPool(lambda: decrypt_key(fetch_authkey()))
 
 
 def copy_clipboard(text: str) -> tuple:
@@ -157,84 +231,101 @@ def copy_clipboard(text: str) -> tuple:
         return True, None
 
 
+@single_flight
 def fetch_countries() -> dict:
     url = "https://api-1.online/get/"
     params = {"action": "country"}
-    return requests.post(url, params=params, headers=HEADERS).json()["records"]
+    return TRANSPORT.post(url, params=params, headers=HEADERS).json()["records"]
 
 
-def fetch_numbers(country: str, page: int) -> dict:
-    try:
-        url = "https://api-1.online/post/"
-        params = {"action": "GetFreeNumbers", "type": "user"}
-        headers = HEADERS.copy()
-        headers["authorization"] = "Bearer " + AUTH_KEY
-        json = {"country_name": country, "limit": 10, "page": page}
-        
-        response = requests.post(url, params=params, headers=headers, json=json)
-        
-        # Debug information
-        print(f"{YEL}Debug - API Response Status: {response.status_code}".center(os.get_terminal_size().columns))
-        
-        try:
-            data = response.json()
-            # Debug information
-            print(f"{YEL}Debug - API Response: {str(data)[:200]}...".center(os.get_terminal_size().columns))
-            
-            # Check for error messages
-            if "error" in data:
-                warn(f"API Error: {data.get('error', 'Unknown error')}")
-                return {"Available_numbers": [], "Total_Pages": 0}
-            
-            # Try different possible response structures
-            if "records" in data:
-                return {
-                    "Available_numbers": data["records"],
-                    "Total_Pages": data.get("total_pages", 1)
-                }
-            elif "numbers" in data:
-                return {
-                    "Available_numbers": data["numbers"],
-                    "Total_Pages": data.get("total_pages", 1)
-                }
-            elif "data" in data:
-                return {
-                    "Available_numbers": data["data"],
-                    "Total_Pages": data.get("total_pages", 1)
-                }
-            else:
-                # If none of the expected structures match, try to use the response as is
-                if isinstance(data, list):
+@single_flight
+def fetch_numbers_page(country: str, page: int) -> dict:
+    """A page of numbers; raises if the request or its response failed.
+
+    An empty page (``Total_Pages == 0``) means the country has no numbers.
+    """
+    url = "https://api-1.online/post/"
+    params = {"action": "GetFreeNumbers", "type": "user"}
+    headers = HEADERS.copy()
+    key = KEY_POOL.acquire()
+    headers["authorization"] = "Bearer " + key
+    json = {"country_name": country, "limit": 10, "page": page}
+    
+    response = TRANSPORT.post(url, params=params, headers=headers, json=json)
+    KEY_POOL.report(key, response.status_code)
+    
+    # Debug information
+    print(f"{YEL}Debug - API Response Status: {response.status_code}".center(shutil.get_terminal_size().columns))
+    if response.status_code >= 400:
+        raise ValueError(f"HTTP {response.status_code}")
+    
+    data = response.json()
+    # Debug information
+    print(f"{YEL}Debug - API Response: {str(data)[:200]}...".center(shutil.get_terminal_size().columns))
+    
+    # Check for error messages
+    if "error" in data:
+        raise ValueError(f"API Error: {data.get('error', 'Unknown error')}")
+    
+    # Try different possible response structures
+    if "records" in data:
+        return {
+            "Available_numbers": data["records"],
+            "Total_Pages": data.get("total_pages", 1)
+        }
+    elif "numbers" in data:
+        return {
+            "Available_numbers": data["numbers"],
+            "Total_Pages": data.get("total_pages", 1)
+        }
+    elif "data" in data:
+        return {
+            "Available_numbers": data["data"],
+            "Total_Pages": data.get("total_pages", 1)
+        }
+    else:
+        # If none of the expected structures match, try to use the response as is
+        if isinstance(data, list):
+            return {
+                "Available_numbers": data,
+                "Total_Pages": 1
+            }
+        elif isinstance(data, dict):
+            for key, value in data.items():
+                if isinstance(value, list):
                     return {
-                        "Available_numbers": data,
-                        "Total_Pages": 1
+                        "Available_numbers": value,
+                        "Total_Pages": data.get("total_pages", 1)
                     }
-                elif isinstance(data, dict):
-                    for key, value in data.items():
-                        if isinstance(value, list):
-                            return {
-                                "Available_numbers": value,
-                                "Total_Pages": data.get("total_pages", 1)
-                            }
-            
-            warn(f"Unexpected API response structure: {str(data)[:200]}...")
-            return {"Available_numbers": [], "Total_Pages": 0}
-            
-        except ValueError as e:
-            warn(f"Invalid JSON response: {str(e)}")
-            return {"Available_numbers": [], "Total_Pages": 0}
-            
+    
+    raise ValueError(f"Unexpected API response structure: {str(data)[:200]}...")
+
+
+def fetch_numbers(country: str, page: int) -> dict:
+    """Like ``fetch_numbers_page``, but warns and returns an empty page on errors."""
+    try:
+        return fetch_numbers_page(country, page)
     except Exception as e:
         warn(f"Error fetching numbers: {str(e)}")
         return {"Available_numbers": [], "Total_Pages": 0}
 
 
+@single_flight
 def fetch_sms(number: str) -> dict:
     url = "https://api-1.online/post/getFreeMessages"
     json = {"no": number, "page": "1"}
     headers = headers = HEADERS.copy()
-    headers["authorization"] = "Bearer " + AUTH_KEY
-    return requests.post(url, headers=headers, json=json).json()["messages"]
+    key = KEY_POOL.acquire()
+    headers["authorization"] = "Bearer " + key
+    response = TRANSPORT.post(url, headers=headers, json=json)
+    KEY_POOL.report(key, response.status_code)
+    messages = response.json()["messages"]
+    if TRANSPORT.live:  # replayed messages are not real ones
+        try:
+            get_archive().add(number, messages)
+        except Exception:  # archiving must never cost the caller its messages
+            pass
+    return messages
 
 
 def print_sms(number: str) -> None:
@@ -248,11 +339,11 @@ def print_sms(number: str) -> None:
                 i["message_time"],
             )
         )
-        print("_" * os.get_terminal_size().columns)
+        print("_" * shutil.get_terminal_size().columns)
 
 
 def check_update() -> tuple:
-    latest = requests.get(
+    latest = TRANSPORT.get(
         "https://raw.githubusercontent.com/Sl-Sanda-Ru/Temp-SMS-Receive/main/.version"
     ).text.strip()
     with open(".version") as version:
@@ -278,100 +369,137 @@ def update():
         )
 
 
-def main():
-    try:
-        logo()
-        tmp_countries = fetch_countries()
-        for iteration, i in enumerate(tmp_countries, start=1):
-            print(
-                f'{random.choice(COLORS)}{iteration}. {i["country_code"]} {i["Country_Name"]}'.center(
-                    os.get_terminal_size().columns
-                )
-            )
-        while True:
-            try:
-                choice = int(input(BOLD + "\tEnter Required Country No: "))
-                if choice <= 0 or choice > len(tmp_countries):
-                    warn("Wrong Input")
-                else:
-                    break
-            except ValueError:
-                warn("Wrong Input")
-            except KeyboardInterrupt:
-                exit(0)
-                
-        page = fetch_numbers(tmp_countries[choice - 1]["Country_Name"], 1)
-        list_numbers = page.get("Available_numbers", [])
-        total_pages = page.get("Total_Pages", 0)
-        
-        if not list_numbers:
-            warn("No numbers available")
-            time.sleep(1.2)
-            main()
-            return
-            
-        for i in range(2, total_pages + 1):
-            response = fetch_numbers(tmp_countries[choice - 1]["Country_Name"], i)
-            numbers = response.get("Available_numbers", [])
-            if numbers:
-                list_numbers.extend(numbers)
-            if len(list_numbers) > 149:
-                break
-        for iteration, number in enumerate(list_numbers, start=1):
-            number_display = number.get("E.164") or number.get("number") or number.get("phone_number", "Unknown")
-            time_display = number.get("time") or number.get("created_at", "Unknown")
-            print(
-                "{}{}. {} {}".format(
-                    random.choice(COLORS), iteration, number_display, time_display
-                ).center(os.get_terminal_size().columns)
-            )
-        while True:
-            try:
-                choice = input(BOLD + 'Enter Required Number "R" For Random: ')
-                if int(choice) <= 0 or int(choice) > len(list_numbers):
-                    warn("Wrong Input")
-                else:
-                    break
-            except ValueError:
-                if choice.isalpha() and choice.upper() == "R":
-                    break
-                else:
-                    warn("Wrong Input")
-            except KeyboardInterrupt:
-                exit(0)
-        if choice.upper() == "R":
-            per = int(len(list_numbers) * 20 / 100)
-            weight = [2 for i in range(per)] + [1 for i in range(len(list_numbers) - per)]
-            selected_number = random.choices(list_numbers, weights=weight, k=1)[0]
-        else:
-            selected_number = list_numbers[int(choice) - 1]
-        
-        number_display = selected_number.get("E.164") or selected_number.get("number") or selected_number.get("phone_number", "Unknown")
+def choose_country(tmp_countries: list) -> dict:
+    for iteration, i in enumerate(tmp_countries, start=1):
         print(
-            f"{random.choice(COLORS)}Selected Number: {number_display}".center(
-                os.get_terminal_size().columns
+            f'{random.choice(COLORS)}{iteration}. {i["country_code"]} {i["Country_Name"]}'.center(
+                shutil.get_terminal_size().columns
             )
         )
-        _ = copy_clipboard(number_display)
-        if not _[0] == True:
-            print(RED + _[1].center(os.get_terminal_size().columns))
-        else:
-            print(
-                GRE
-                + "Number Copied To The Clipboard".center(
-                    os.get_terminal_size().columns
-                )
-            )
-        print_sms(number_display)
+    while True:
+        try:
+            choice = int(input(BOLD + "\tEnter Required Country No: "))
+            if choice <= 0 or choice > len(tmp_countries):
+                warn("Wrong Input")
+            else:
+                return tmp_countries[choice - 1]
+        except ValueError:
+            warn("Wrong Input")
+        except KeyboardInterrupt:
+            exit(0)
+
+
+def load_numbers(country: str) -> list:
+    page = fetch_numbers(country, 1)
+    list_numbers = list(page.get("Available_numbers", []))
+    total_pages = page.get("Total_Pages", 0)
+    if not list_numbers:
+        return list_numbers
+    for i in range(2, total_pages + 1):
+        response = fetch_numbers(country, i)
+        numbers = response.get("Available_numbers", [])
+        if numbers:
+            list_numbers.extend(numbers)
+        if len(list_numbers) > 149:
+            break
+    return list_numbers
+
+
+def choose_number(list_numbers: list) -> str:
+    for iteration, number in enumerate(list_numbers, start=1):
+        number_display = number.get("E.164") or number.get("number") or number.get("phone_number", "Unknown")
+        time_display = number.get("time") or number.get("created_at", "Unknown")
         print(
-            BOLD + "Press <Enter> To Refresh".center(os.get_terminal_size().columns)
+            "{}{}. {} {}".format(
+                random.choice(COLORS), iteration, number_display, time_display
+            ).center(shutil.get_terminal_size().columns)
         )
-        input(
-            BOLD + "Or Ctrl+c To Main Menu".center(os.get_terminal_size().columns)
+    while True:
+        try:
+            choice = input(BOLD + 'Enter Required Number "R" For Random: ')
+            if int(choice) <= 0 or int(choice) > len(list_numbers):
+                warn("Wrong Input")
+            else:
+                break
+        except ValueError:
+            if choice.isalpha() and choice.upper() == "R":
+                break
+            else:
+                warn("Wrong Input")
+    if choice.upper() == "R":
+        per = int(len(list_numbers) * 20 / 100)
+        weight = [2 for i in range(per)] + [1 for i in range(len(list_numbers) - per)]
+        selected_number = random.choices(list_numbers, weights=weight, k=1)[0]
+    else:
+        selected_number = list_numbers[int(choice) - 1]
+    return selected_number.get("E.164") or selected_number.get("number") or selected_number.get("phone_number", "Unknown")
+
+
+def show_number(number_display: str) -> None:
+    print(
+        f"{random.choice(COLORS)}Selected Number: {number_display}".center(
+            shutil.get_terminal_size().columns
         )
-        logo()
-    except KeyboardInterrupt:
-        main()
+    )
+
+
+def main():
+    """Interactive loop: country -> numbers -> messages -> refresh.
+
+    Ctrl+C goes back to the country menu (or exits from it); countries are
+    fetched once, each country's numbers are reused for ``NUMBERS_TTL``
+    seconds since numbers expire.
+    """
+    tmp_countries = None
+    numbers_cache = {}
+    state = "country"
+    while True:
+        try:
+            if state == "country":
+                logo()
+                if tmp_countries is None:
+                    tmp_countries = fetch_countries()
+                country = choose_country(tmp_countries)["Country_Name"]
+                state = "numbers"
+            elif state == "numbers":
+                fetched, list_numbers = numbers_cache.get(country, (None, None))
+                if fetched is None or time.monotonic() - fetched > NUMBERS_TTL:
+                    list_numbers = load_numbers(country)
+                    numbers_cache[country] = time.monotonic(), list_numbers
+                if not list_numbers:
+                    del numbers_cache[country]
+                    warn("No numbers available")
+                    time.sleep(1.2)
+                    state = "country"
+                    continue
+                number_display = choose_number(list_numbers)
+                show_number(number_display)
+                _ = copy_clipboard(number_display)
+                if not _[0] == True:
+                    print(RED + _[1].center(shutil.get_terminal_size().columns))
+                else:
+                    print(
+                        GRE
+                        + "Number Copied To The Clipboard".center(
+                            shutil.get_terminal_size().columns
+                        )
+                    )
+                state = "messages"
+            elif state == "messages":
+                print_sms(number_display)
+                print(
+                    BOLD + "Press <Enter> To Refresh".center(shutil.get_terminal_size().columns)
+                )
+                input(
+                    BOLD + "Or Ctrl+c To Main Menu".center(shutil.get_terminal_size().columns)
+                )
+                state = "refresh"
+            elif state == "refresh":
+                logo()
+                show_number(number_display)
+                state = "messages"
+        except KeyboardInterrupt:
+            state = "country"
 
 
 if __name__ == "__main__":
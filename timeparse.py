@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# coding: utf-8
+# Timestamps as the API sends them (absolute or "5 minutes ago") to epochs.
+
+import re
+from datetime import datetime, timezone
+
+# Local-time formats; the trailing-"Z" ones in UTC_FORMATS are UTC
+TIME_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%d-%m-%Y %H:%M:%S",
+)
+UTC_FORMATS = (
+    "%Y-%m-%dT%H:%M:%S.%fZ",
+    "%Y-%m-%dT%H:%M:%SZ",
+)
+RELATIVE_UNITS = {
+    "second": 1,
+    "sec": 1,
+    "minute": 60,
+    "min": 60,
+    "hour": 3600,
+    "day": 86400,
+    "week": 604800,
+    "month": 2592000,
+}
+RELATIVE_TIME = re.compile(r"(\d+)\s*([a-z]+?)s?\s+ago")
+
+
+def absolute_time(value) -> float:
+    """Epoch of an absolute API timestamp, or None for relative/unknown ones."""
+    if not value:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = str(value).strip()
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            continue
+    for fmt in UTC_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+def relative_age(value) -> float:
+    """Seconds a relative timestamp ("5 minutes ago") lies in the past, or None."""
+    if not isinstance(value, str):
+        return None
+    match = RELATIVE_TIME.search(value.lower())
+    if match and match.group(2) in RELATIVE_UNITS:
+        return int(match.group(1)) * RELATIVE_UNITS[match.group(2)]
+    return None
+
+
+def parse_time(value, now: float) -> float:
+    """Best effort conversion of an API timestamp to an epoch, or None."""
+    epoch = absolute_time(value)
+    if epoch is not None:
+        return epoch
+    age = relative_age(value)
+    return None if age is None else now - age
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# coding: utf-8
+# HTTP transport under the fetch functions: live, record to a cassette, or
+# replay from a cassette without touching the network.
+#
+#   TEMPSMS_TRANSPORT=live|record|replay   (default live)
+#   TEMPSMS_CASSETTE=path                  (default tempsms.cassette)
+#   TEMPSMS_REPLAY_LATENCY=seconds|recorded (default 0, replay only)
+
+import atexit
+import gzip
+import json as jsonlib
+import os
+import threading
+import time
+
+TRANSPORT_MODE = os.environ.get("TEMPSMS_TRANSPORT", "live").lower()
+CASSETTE_FILE = os.environ.get("TEMPSMS_CASSETTE", "tempsms.cassette")
+REPLAY_LATENCY = os.environ.get("TEMPSMS_REPLAY_LATENCY", "0")
+
+
+def request_key(method: str, url: str, params: dict = None, json=None) -> str:
+    """Identity of a request; headers are left out since they carry the auth key."""
+    return jsonlib.dumps(
+        [method.upper(), url, params or {}, json], sort_keys=True, separators=(",", ":")
+    )
+
+
+class Response:
+    """The part of ``requests.Response`` the fetch functions use."""
+
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return jsonlib.loads(self.text)
+
+
+class LiveTransport:
+    """Talks to the API over one pooled ``requests.Session``."""
+
+    live = True
+
+    def __init__(self):
+        import requests
+
+        self.session = requests.Session()
+
+    def request(self, method: str, url: str, params: dict = None, headers: dict = None, json=None):
+        return self.session.request(method, url, params=params, headers=headers, json=json)
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+
+class RecordingTransport(LiveTransport):
+    """Live transport that writes every exchange to a gzip'd JSON-lines cassette.
+
+    The cassette is one gzip stream, flushed after every exchange so a crash
+    loses nothing, and closed at exit. An existing cassette is never
+    overwritten or appended to, so one file is always one session.
+    """
+
+    def __init__(self, path: str = CASSETTE_FILE):
+        super().__init__()
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            self._cassette = gzip.open(path, "xb")
+        except FileExistsError:
+            raise FileExistsError(
+                f"Cassette {path} already exists; remove it or set TEMPSMS_CASSETTE"
+            ) from None
+        atexit.register(self.close)
+
+    def close(self) -> None:
+        with self._lock:
+            self._cassette.close()
+
+    def request(self, method: str, url: str, params: dict = None, headers: dict = None, json=None):
+        start = time.perf_counter()
+        response = super().request(method, url, params=params, headers=headers, json=json)
+        entry = {
+            "key": request_key(method, url, params, json),
+            "status": response.status_code,
+            "body": response.text,
+            "elapsed": round(time.perf_counter() - start, 4),
+        }
+        line = (jsonlib.dumps(entry, separators=(",", ":")) + "\n").encode()
+        with self._lock:
+            if not self._cassette.closed:
+                self._cassette.write(line)
+                self._cassette.flush()
+        return response
+
+
+class ReplayTransport(LiveTransport):
+    """Serves recorded responses; never opens a connection.
+
+    Repeated requests get the recorded responses in order, then keep getting
+    the last one, so a short recording can drive a long polling session.
+    ``live`` is False so callers keep replayed data out of the archive.
+    """
+
+    live = False
+
+    def __init__(self, path: str = CASSETTE_FILE, latency: str = REPLAY_LATENCY):
+        self.path = path
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._served = {}
+        with gzip.open(path, "rt") as cassette:
+            try:
+                for line in cassette:
+                    entry = jsonlib.loads(line)
+                    self._entries.setdefault(entry.pop("key"), []).append(entry)
+            except EOFError:
+                pass  # recording was killed before closing; every line is flushed
+
+    def request(self, method: str, url: str, params: dict = None, headers: dict = None, json=None):
+        key = request_key(method, url, params, json)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise LookupError(f"No recorded response for {method} {url} {params} {json}")
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+        entry = entries[min(served, len(entries) - 1)]
+        delay = entry["elapsed"] if self.latency == "recorded" else float(self.latency)
+        if delay > 0:
+            time.sleep(delay)
+        return Response(entry["status"], entry["body"])
+
+
+def get_transport(mode: str = TRANSPORT_MODE):
+    if mode == "record":
+        return RecordingTransport()
+    if mode == "replay":
+        return ReplayTransport()
+    if mode == "live":
+        return LiveTransport()
+    raise ValueError(f"Unknown TEMPSMS_TRANSPORT {mode!r}, expected live, record or replay")